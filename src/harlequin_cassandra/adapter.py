@@ -1,19 +1,26 @@
 from __future__ import annotations
 
+import sqlite3
+import threading
+import time
 from datetime import date
 from itertools import cycle
-from typing import Any
+from math import ceil
+from typing import Any, Callable
 
 from cassandra.auth import PlainTextAuthProvider
 from cassandra.cluster import (
     Cluster,
     ConsistencyLevel,
     PreparedStatement,
+    ResultSet,
     Session,
 )
+from cassandra.concurrent import execute_concurrent
 from cassandra.cqltypes import CassandraType
-from cassandra.metadata import KeyspaceMetadata
+from cassandra.metadata import KeyspaceMetadata, protect_name
 from cassandra.protocol import SyntaxException
+from cassandra.query import SimpleStatement, tuple_factory
 from harlequin import (
     HarlequinAdapter,
     HarlequinConnection,
@@ -28,15 +35,41 @@ from textual_fastdatatable.backend import AutoBackendType
 
 from harlequin_cassandra.cli_options import CASSANDRA_OPTIONS
 from harlequin_cassandra.completions import _get_completions
+from harlequin_cassandra.history import (
+    QueryHistory,
+    QueryRecord,
+    estimate_rows_size,
+    fingerprint,
+)
+from harlequin_cassandra.paging import PagePrefetcher, PageSizer
+from harlequin_cassandra.sampling import (
+    SAMPLE_CONCURRENCY,
+    SAMPLE_SLICE_SIZE,
+    TOKEN_BOUNDS,
+    parse_sample_target,
+    probe_ranges,
+    split_ranges,
+    token_ranges,
+)
+from harlequin_cassandra.script import (
+    ScriptStatement,
+    group_statements,
+    split_statements,
+)
 
 
 class HarlequinCassandraCursor(HarlequinCursor):
     def __init__(
-        self, conn: HarlequinCassandraConnection, statement: PreparedStatement
+        self,
+        conn: HarlequinCassandraConnection,
+        statement: PreparedStatement,
+        prepare_ms: float = 0.0,
     ) -> None:
         self.conn = conn
         self.statement = statement
         self._limit: int | None = None
+        self._sample: int | None = None
+        self._prepare_ms = prepare_ms
 
     def columns(self) -> list[tuple[str, str]]:
         names = self.data.column_names if self.data.column_names else ()
@@ -54,40 +87,139 @@ class HarlequinCassandraCursor(HarlequinCursor):
         self._limit = limit
         return self
 
+    def set_sample(self, size: int) -> HarlequinCassandraCursor:
+        """Return roughly `size` rows spread across the token ring, instead of
+        the first rows in token order.
+        """
+        if size < 1:
+            raise HarlequinQueryError(
+                msg=f"Sample size must be greater than 0, got {size}.",
+                title="Harlequin could not sample your query.",
+            )
+        self._sample = size
+        return self
+
+    def _fetch_sample(self, size: int) -> AutoBackendType:
+        started = time.perf_counter()
+        self.data, rows = self.conn._sample(self.statement.query_string, size)
+        self.conn._record_query(
+            query=self.statement.query_string,
+            rows=len(rows),
+            size=estimate_rows_size(rows),
+            prepare_ms=self._prepare_ms,
+            execute_ms=(time.perf_counter() - started) * 1000,
+            fetch_ms=0.0,
+        )
+        return rows or None
+
     def fetchall(self) -> AutoBackendType:
+        if self._sample:
+            return self._fetch_sample(
+                min(self._sample, self._limit) if self._limit else self._sample
+            )
         result: tuple[list[Any]] | None = None
+        rows: list[Any] = []
+        size = 0
+        started = time.perf_counter()
+        executed: float | None = None
+        # NOTE: the session returns raw rows, they are converted
+        #       here while the next pages are fetched by the driver.
+        table = self.conn.page_sizer.table_key(self.statement)
         try:
-            self.data = self.conn.conn.execute(self.statement)
+            bound = self.statement.bind(())
+            bound.fetch_size = self.conn.page_sizer.fetch_size(
+                table, self.conn.page_sizer.column_types(self.statement)
+            )
+            future = self.conn.conn.execute_async(bound)
+            pages = PagePrefetcher(future, depth=self.conn.prefetch_depth)
+            for page in pages:
+                if executed is None:
+                    executed = time.perf_counter()
+                    self.data = ResultSet(future, page)
+                converted = self.conn.row_factory(self.data.column_names, page or [])
+                rows.extend(converted)
+                page_bytes = estimate_rows_size(converted)
+                size += page_bytes
+                pages.fetch_size = self.conn.page_sizer.observe(
+                    table,
+                    rows=len(converted),
+                    page_bytes=page_bytes,
+                    fetch_size=pages.fetch_size or bound.fetch_size,
+                    latency_ms=pages.latency_ms,
+                )
+                if self._limit and len(rows) >= self._limit:
+                    pages.cancel()
+                    excess = len(rows) - self._limit
+                    size -= page_bytes * excess // max(len(converted), 1)
+                    del rows[self._limit :]
+                    break
         except Exception as e:
             raise HarlequinQueryError(
                 msg=str(e),
                 title="Harlequin encountered an error while executing your query.",
             ) from e
-        if self.data:
-            if self._limit:
-                count = 0
-                limited_result: tuple = ()
-                for row in self.data:
-                    limited_result = limited_result + (row,)
-                    count += 1
-                    if count == self._limit:
-                        break
-                result = limited_result
-            else:
-                result = tuple([row for row in self.data])
+        if rows:
+            result = tuple(rows)
+        fetched = time.perf_counter()
+        executed = executed or fetched
+        self.conn._record_query(
+            query=self.statement.query_string,
+            rows=len(rows),
+            size=size,
+            prepare_ms=self._prepare_ms,
+            execute_ms=(executed - started) * 1000,
+            fetch_ms=(fetched - executed) * 1000,
+        )
         return result
 
 
+class HarlequinCassandraScriptCursor(HarlequinCursor):
+    """Cursor over a multi-statement script, returns a summary row per
+    statement once the script is executed.
+    """
+
+    def __init__(
+        self, conn: HarlequinCassandraConnection, statements: list[ScriptStatement]
+    ) -> None:
+        self.conn = conn
+        self.statements = statements
+        self._limit: int | None = None
+
+    def columns(self) -> list[tuple[str, str]]:
+        return [("#", "#"), ("statement", "s"), ("status", "s"), ("rows", "#")]
+
+    def set_limit(self, limit: int) -> HarlequinCassandraScriptCursor:
+        self._limit = limit
+        return self
+
+    def fetchall(self) -> AutoBackendType:
+        summary = self.conn._execute_script(self.statements)
+        return summary[: self._limit] if self._limit else summary
+
+
 class HarlequinCassandraConnection(HarlequinConnection):
     def __init__(
         self,
         conn: Session,
         cluster: Cluster,
         init_message: str = "",
+        history: QueryHistory | None = None,
+        script_concurrency: int = 100,
+        prefetch_depth: int = 2,
+        row_factory: Callable[[list[str], list[Any]], Any] = tuple_factory,
+        page_sizer: PageSizer | None = None,
     ) -> None:
         self.conn = conn
         self.init_message = init_message
         self.cluster = cluster
+        self.history = history
+        self.script_concurrency = script_concurrency
+        self.prefetch_depth = prefetch_depth
+        self.row_factory = row_factory
+        self.page_sizer = page_sizer or PageSizer()
+        # NOTE: prepared statements warmed up from the query history, keyed by
+        #       keyspace and fingerprint.
+        self._prepared_statements: dict[tuple[str | None, str], PreparedStatement] = {}
 
         # NOTE: (vkhitrin) label is limitted to 10 characters,
         #       if it's longer, it will not be displayed
@@ -99,14 +231,264 @@ class HarlequinCassandraConnection(HarlequinConnection):
         self._transaction_mode = next(self._transaction_mode_gen)
 
     def execute(self, query: str) -> HarlequinCursor | None:
+        started = time.perf_counter()
+        statements = split_statements(query)
+        if len(statements) > 1:
+            return HarlequinCassandraScriptCursor(self, statements)
+        if statements and statements[0].is_ddl:
+            self._prepared_statements.clear()
+        statement = (
+            self._prepared_statements.get((self.conn.keyspace, fingerprint(query)))
+            if self._prepared_statements
+            else None
+        )
+        if statement is None:
+            try:
+                statement = self.conn.prepare(query)
+            except Exception as e:
+                raise HarlequinQueryError(
+                    msg=str(e),
+                    title="Harlequin encountered an error while preparing your query.",
+                ) from e
+        prepare_ms = (time.perf_counter() - started) * 1000
+        return HarlequinCassandraCursor(self, statement, prepare_ms=prepare_ms)
+
+    def warm_up(self, limit: int = 20) -> None:
+        """Prepare the most frequently executed statements from the query history
+        ahead of time, so their first execution skips the prepare round trip.
+
+        Statements are matched by fingerprint. Statements with literal values are
+        not prepared, since a prepared statement keeps the values it was
+        prepared with.
+        """
+        if self.history is None:
+            return
+        keyspace = self.conn.keyspace
+        for query in self.history.warmup_candidates(keyspace=keyspace, limit=limit):
+            query_fingerprint = fingerprint(query)
+            if "?" in query_fingerprint or ScriptStatement(index=0, query=query).is_ddl:
+                continue
+            try:
+                statement = self.conn.prepare(query)
+            except Exception:
+                continue
+            self._prepared_statements[(keyspace, query_fingerprint)] = statement
+
+    def _execute_script(
+        self, statements: list[ScriptStatement]
+    ) -> list[tuple[int, str, str, int | None]]:
+        """Execute a script, running groups of independent statements
+        concurrently and waiting for schema agreement after DDL statements.
+        Execution stops after the first group containing a failed statement.
+        """
+        outcomes: dict[int, tuple[str, int | None]] = {}
+        records: list[QueryRecord] = []
+        failed = False
+        for group in group_statements(statements):
+            if failed:
+                for statement in group:
+                    outcomes[statement.index] = ("SKIPPED", None)
+                continue
+            started = time.perf_counter()
+            if len(group) > 1:
+                results = execute_concurrent(
+                    self.conn,
+                    [(SimpleStatement(statement.query), None) for statement in group],
+                    concurrency=self.script_concurrency,
+                    raise_on_first_error=False,
+                )
+                # NOTE: the driver does not time statements executed
+                #       concurrently, each is recorded with its share of the
+                #       time taken by the group.
+                execute_ms = (time.perf_counter() - started) * 1000 / len(group)
+                for statement, (success, result) in zip(group, results):
+                    outcomes[statement.index] = ("OK" if success else str(result), None)
+                    failed = failed or not success
+                    if success:
+                        records.append(
+                            self._query_record(
+                                query=statement.query,
+                                rows=0,
+                                size=0,
+                                prepare_ms=0.0,
+                                execute_ms=execute_ms,
+                                fetch_ms=0.0,
+                            )
+                        )
+                continue
+
+            statement = group[0]
+            if statement.is_ddl:
+                self._prepared_statements.clear()
+            try:
+                result = self.conn.execute(statement.query)
+            except Exception as e:
+                outcomes[statement.index] = (str(e), None)
+                failed = True
+                continue
+            executed = time.perf_counter()
+            # NOTE: only the first page is read, a script only reports how
+            #       many rows a statement returned and should not scan tables.
+            fetched_rows = result.current_rows if result.column_names else []
+            if (
+                statement.is_ddl
+                and not result.response_future.is_schema_agreed
+                and not self.cluster.control_connection.wait_for_schema_agreement()
+            ):
+                outcomes[statement.index] = ("Schema agreement timed out", None)
+                failed = True
+                continue
+            outcomes[statement.index] = (
+                "OK (first page)" if result.has_more_pages else "OK",
+                len(fetched_rows) if result.column_names else None,
+            )
+            records.append(
+                self._query_record(
+                    query=statement.query,
+                    rows=len(fetched_rows),
+                    size=estimate_rows_size(fetched_rows),
+                    prepare_ms=0.0,
+                    execute_ms=(executed - started) * 1000,
+                    fetch_ms=(time.perf_counter() - executed) * 1000,
+                )
+            )
+        self._save_records(records)
+        return [
+            (
+                statement.index,
+                " ".join(statement.query.split()),
+                *outcomes[statement.index],
+            )
+            for statement in statements
+        ]
+
+    def _sample(self, query: str, size: int) -> tuple[ResultSet, tuple[Any, ...]]:
+        """Sample roughly `size` rows of a table by reading small slices of
+        randomly picked token ranges concurrently, until enough rows are read.
+        """
+        target = parse_sample_target(query)
+        if target is None:
+            raise HarlequinQueryError(
+                msg="Only `SELECT <columns> FROM <table>` queries can be sampled.",
+                title="Harlequin could not sample your query.",
+            )
+        keyspace = target.keyspace or self.conn.keyspace
+        keyspace_metadata = self.cluster.metadata.keyspaces.get(keyspace)
+        table_metadata = (
+            keyspace_metadata.tables.get(target.table_name)
+            if keyspace_metadata
+            else None
+        )
+        token_map = self.cluster.metadata.token_map
+        bounds = TOKEN_BOUNDS.get(token_map.token_class.__name__) if token_map else None
+        if table_metadata is None or token_map is None or bounds is None:
+            raise HarlequinQueryError(
+                msg=(
+                    f"Table {target.table} was not found in the cluster metadata, "
+                    "or the cluster partitioner does not support sampling."
+                ),
+                title="Harlequin could not sample your query.",
+            )
+        partition_key = ", ".join(
+            protect_name(column.name) for column in table_metadata.partition_key
+        )
         try:
-            statement: PreparedStatement = self.conn.prepare(query)
+            probe = self.conn.prepare(
+                f"SELECT {target.columns} FROM {target.table} "
+                f"WHERE token({partition_key}) > ? AND token({partition_key}) <= ? "
+                f"LIMIT {SAMPLE_SLICE_SIZE}"
+            )
         except Exception as e:
             raise HarlequinQueryError(
                 msg=str(e),
                 title="Harlequin encountered an error while preparing your query.",
             ) from e
-        return HarlequinCassandraCursor(self, statement)
+
+        probes_per_round = ceil(size / SAMPLE_SLICE_SIZE)
+        probes = probe_ranges(
+            split_ranges(
+                token_ranges([token.value for token in token_map.ring], bounds),
+                probes_per_round,
+            )
+        )
+        data: ResultSet | None = None
+        rows: list[Any] = []
+        for offset in range(0, len(probes), probes_per_round):
+            if len(rows) >= size:
+                break
+            results = execute_concurrent(
+                self.conn,
+                [(probe, p) for p in probes[offset : offset + probes_per_round]],
+                concurrency=min(probes_per_round, SAMPLE_CONCURRENCY),
+                raise_on_first_error=False,
+            )
+            for success, result in results:
+                if not success:
+                    raise HarlequinQueryError(
+                        msg=str(result),
+                        title="Harlequin encountered an error while sampling "
+                        "your query.",
+                    )
+                if data is None:
+                    data = result
+                rows.extend(self.row_factory(result.column_names, result.current_rows))
+        return data, tuple(rows[:size])
+
+    def _query_record(
+        self,
+        query: str,
+        rows: int,
+        size: int,
+        prepare_ms: float,
+        execute_ms: float,
+        fetch_ms: float,
+    ) -> QueryRecord:
+        return QueryRecord(
+            query=query,
+            keyspace=self.conn.keyspace,
+            consistency_level=ConsistencyLevel.value_to_name.get(
+                self.conn.default_consistency_level
+            ),
+            rows=rows,
+            bytes=size,
+            prepare_ms=prepare_ms,
+            execute_ms=execute_ms,
+            fetch_ms=fetch_ms,
+        )
+
+    def _record_query(
+        self,
+        query: str,
+        rows: int,
+        size: int,
+        prepare_ms: float,
+        execute_ms: float,
+        fetch_ms: float,
+    ) -> None:
+        if self.history is None:
+            return
+        self._save_records(
+            [
+                self._query_record(
+                    query=query,
+                    rows=rows,
+                    size=size,
+                    prepare_ms=prepare_ms,
+                    execute_ms=execute_ms,
+                    fetch_ms=fetch_ms,
+                )
+            ]
+        )
+
+    def _save_records(self, records: list[QueryRecord]) -> None:
+        if self.history is None:
+            return
+        # NOTE: failing to record history should never
+        #       fail the query itself.
+        try:
+            self.history.record_many(records)
+        except sqlite3.Error:
+            pass
 
     def validate_sql(self, query: str) -> str:
         try:
@@ -298,6 +680,8 @@ class HarlequinCassandraConnection(HarlequinConnection):
 
     def close(self) -> None:
         self.cluster.shutdown()
+        if self.history is not None:
+            self.history.close()
 
 
 class HarlequinCassandraAdapter(HarlequinAdapter):
@@ -319,6 +703,12 @@ class HarlequinCassandraAdapter(HarlequinAdapter):
         else CASSANDRA_OPTIONS[4].default,
         protocol_version: int = CASSANDRA_OPTIONS[5].default,
         consistency_level: str = CASSANDRA_OPTIONS[6].default,
+        history_path: str | None = None,
+        script_concurrency: str = CASSANDRA_OPTIONS[8].default,
+        prefetch_depth: str = CASSANDRA_OPTIONS[9].default,
+        page_target_bytes: str = CASSANDRA_OPTIONS[10].default,
+        page_min_rows: str = CASSANDRA_OPTIONS[11].default,
+        page_max_rows: str = CASSANDRA_OPTIONS[12].default,
         **_: Any,
     ) -> None:
         self.auth_options = {
@@ -335,6 +725,14 @@ class HarlequinCassandraAdapter(HarlequinAdapter):
         if keyspace:
             self.connection_options["keyspace"] = keyspace
         self.consistency_level = consistency_level
+        self.history_path = history_path
+        self.script_concurrency = int(script_concurrency)
+        self.prefetch_depth = int(prefetch_depth)
+        self.page_sizer_options: dict[str, int] = {
+            "target_bytes": int(page_target_bytes),
+            "min_rows": int(page_min_rows),
+            "max_rows": int(page_max_rows),
+        }
 
     # TODO: (vkhitrin) should be revisited in the future.
     #       Iterrate and work on mapping Cassandra objects to Arrow.
@@ -381,19 +779,40 @@ class HarlequinCassandraAdapter(HarlequinAdapter):
         return [tuple(cass_to_py(row)) for row in rows]
 
     def connect(self) -> HarlequinCassandraConnection:
+        try:
+            history = QueryHistory(self.history_path) if self.history_path else None
+        except (OSError, sqlite3.Error) as e:
+            raise HarlequinConnectionError(
+                msg=f"Exception: {e.__class__}, Message: {e}",
+                title="Harlequin could not open the query history database.",
+            ) from e
         try:
             auth_provider = PlainTextAuthProvider(**self.auth_options)
             self.cluster = Cluster(**self.options, auth_provider=auth_provider)
             conn = self.cluster.connect(**self.connection_options)
-            conn.row_factory = self._cassandra_to_py_factory
+            # NOTE: rows are converted by the connection outside of
+            #       the driver's event loop, see `PagePrefetcher`.
+            conn.row_factory = tuple_factory
             conn.default_consistency_level = ConsistencyLevel.name_to_value.get(
                 self.consistency_level
             )
         except Exception as e:
+            if history is not None:
+                history.close()
             raise HarlequinConnectionError(
                 msg=f"Excpetion: {e.__class__}, Message: {e}",
                 title="Harlequin could not connect to a Cassandra Cluster.",
             ) from e
-        return HarlequinCassandraConnection(
-            conn=conn, cluster=self.cluster, init_message="Connected to a Cassandra Cluster."
+        connection = HarlequinCassandraConnection(
+            conn=conn,
+            cluster=self.cluster,
+            init_message="Connected to a Cassandra Cluster.",
+            history=history,
+            script_concurrency=self.script_concurrency,
+            prefetch_depth=self.prefetch_depth,
+            row_factory=self._cassandra_to_py_factory,
+            page_sizer=PageSizer(**self.page_sizer_options),
         )
+        if history is not None:
+            threading.Thread(target=connection.warm_up, daemon=True).start()
+        return connection
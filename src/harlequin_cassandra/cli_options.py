@@ -1,6 +1,7 @@
 from cassandra.cluster import ConsistencyLevel
 
 from harlequin.options import (
+    PathOption,
     SelectOption,
     TextOption,
 )
@@ -17,6 +18,15 @@ def _int_validator(s: str | None) -> tuple[bool, str]:
         return True, ""
 
 
+def _positive_int_validator(s: str | None) -> tuple[bool, str]:
+    valid, message = _int_validator(s)
+    if not valid or s is None:
+        return valid, message
+    if int(s) < 1:
+        return False, f"'{s}' must be greater than 0!"
+    return True, ""
+
+
 host = TextOption(
     name="host",
     description=(
@@ -89,6 +99,61 @@ consistency_level = SelectOption(
     default="LOCAL_ONE",
 )
 
+history_path = PathOption(
+    name="history-path",
+    description=(
+        "Path to a SQLite database used to record executed queries, their row "
+        "counts and timings. If not specified, query history is not recorded."
+    ),
+    file_okay=True,
+    dir_okay=False,
+)
+
+script_concurrency = TextOption(
+    name="script-concurrency",
+    description=(
+        "Maximum number of in-flight requests when executing independent "
+        "statements of a multi-statement script concurrently. Default: `100`."
+    ),
+    default="100",
+    validator=_positive_int_validator,
+)
+
+prefetch_depth = TextOption(
+    name="prefetch-depth",
+    description=(
+        "Maximum number of result pages fetched ahead of the rows being "
+        "converted. Default: `2`."
+    ),
+    default="2",
+    validator=_positive_int_validator,
+)
+
+page_target_bytes = TextOption(
+    name="page-target-bytes",
+    description=(
+        "Target size of a result page in bytes. The number of rows fetched per "
+        "page is adjusted from the row widths observed per table. "
+        "Default: `1048576`."
+    ),
+    default="1048576",
+    validator=_positive_int_validator,
+)
+
+page_min_rows = TextOption(
+    name="page-min-rows",
+    description=("Minimum number of rows fetched per result page. Default: `100`."),
+    default="100",
+    validator=_positive_int_validator,
+)
+
+page_max_rows = TextOption(
+    name="page-max-rows",
+    description=("Maximum number of rows fetched per result page. Default: `10000`."),
+    default="10000",
+    validator=_positive_int_validator,
+)
+
 CASSANDRA_OPTIONS = [
     host,
     port,
@@ -97,4 +162,10 @@ CASSANDRA_OPTIONS = [
     password,
     protocol_version,
     consistency_level,
+    history_path,
+    script_concurrency,
+    prefetch_depth,
+    page_target_bytes,
+    page_min_rows,
+    page_max_rows,
 ]
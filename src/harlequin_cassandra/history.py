@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    executed_at REAL NOT NULL,
+    fingerprint TEXT NOT NULL,
+    query TEXT NOT NULL,
+    keyspace TEXT,
+    consistency_level TEXT,
+    rows INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    prepare_ms REAL NOT NULL,
+    execute_ms REAL NOT NULL,
+    fetch_ms REAL NOT NULL,
+    total_ms REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS query_history_fingerprint
+    ON query_history (fingerprint, executed_at);
+"""
+
+# NOTE: literals, quoted identifiers and comments are matched by a
+#       single pattern scanning left to right, so comment markers inside of
+#       literals (e.g. URLs) and quotes inside of comments are left alone.
+_QUOTED_OR_COMMENT = re.compile(
+    r"(?P<literal>'(?:[^']|'')*'|\$\$.*?\$\$)"
+    r"|(?P<identifier>\"(?:[^\"]|\"\")*\")"
+    r"|(?P<comment>--[^\n]*|//[^\n]*|/\*.*?\*/)",
+    re.DOTALL,
+)
+# NOTE: order matters, UUIDs must be replaced before numbers so
+#       their digits are not treated as separate literals.
+_FINGERPRINT_PATTERNS: list[tuple[re.Pattern[str], str]] = [
+    (
+        re.compile(
+            r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b",
+            re.IGNORECASE,
+        ),
+        "?",
+    ),
+    (re.compile(r"\b0x[0-9a-f]*\b", re.IGNORECASE), "?"),
+    (re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE), "?"),
+    (re.compile(r"\?(?:\s*,\s*\?)+"), "?"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+# NOTE: quoted identifiers are case sensitive, they are swapped for this
+#       placeholder while the rest of the statement is normalized.
+_IDENTIFIER_PLACEHOLDER = "\ue000"
+
+
+def fingerprint(query: str) -> str:
+    """Normalize a CQL statement by stripping comments and literals, so that
+    statements differing only by their values share the same fingerprint.
+    """
+    identifiers: list[str] = []
+
+    def replace(match: re.Match[str]) -> str:
+        if match.group("literal") is not None:
+            return "?"
+        if match.group("comment") is not None:
+            return " "
+        identifiers.append(match.group(0))
+        return _IDENTIFIER_PLACEHOLDER
+
+    normalized = _QUOTED_OR_COMMENT.sub(replace, query)
+    for pattern, replacement in _FINGERPRINT_PATTERNS:
+        normalized = pattern.sub(replacement, normalized)
+    normalized = normalized.strip().rstrip(";").strip().lower()
+    restored = iter(identifiers)
+    return re.sub(_IDENTIFIER_PLACEHOLDER, lambda _: next(restored), normalized)
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate the serialized size of a converted value in bytes."""
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8", errors="replace"))
+    if isinstance(value, dict):
+        return sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(estimate_size(v) for v in value)
+    return 8
+
+
+def estimate_rows_size(rows: Sequence[Any], sample_rows: int = 100) -> int:
+    """Approximate the size of rows in bytes from the first `sample_rows` of
+    them, so estimating wide results stays cheap.
+    """
+    if not rows:
+        return 0
+    sample = rows[:sample_rows]
+    return sum(estimate_size(row) for row in sample) * len(rows) // len(sample)
+
+
+def _percentile(sorted_values: list[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * percentile / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = rank - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+@dataclass
+class QueryRecord:
+    query: str
+    keyspace: str | None
+    consistency_level: str | None
+    rows: int
+    bytes: int
+    prepare_ms: float
+    execute_ms: float
+    fetch_ms: float
+
+    @property
+    def total_ms(self) -> float:
+        return self.prepare_ms + self.execute_ms + self.fetch_ms
+
+
+@dataclass
+class LatencyStats:
+    fingerprint: str
+    bucket_start: float
+    count: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+@dataclass
+class Regression:
+    fingerprint: str
+    baseline_p95_ms: float
+    recent_p95_ms: float
+    baseline_count: int
+    recent_count: int
+
+    @property
+    def ratio(self) -> float:
+        if not self.baseline_p95_ms:
+            return float("inf")
+        return self.recent_p95_ms / self.baseline_p95_ms
+
+
+class QueryHistory:
+    """Persistent store of executed queries and their timings, backed by a local
+    SQLite database.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        in_memory = str(path) == ":memory:"
+        self.path = Path(path).expanduser()
+        if not in_memory:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        # NOTE: Harlequin runs queries from worker threads,
+        #       access to the connection is serialized with a lock.
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            ":memory:" if in_memory else str(self.path), check_same_thread=False
+        )
+        with self._lock:
+            self._db.executescript(_SCHEMA)
+
+    def record(self, record: QueryRecord, executed_at: float | None = None) -> None:
+        self.record_many([record], executed_at=executed_at)
+
+    def record_many(
+        self, records: Sequence[QueryRecord], executed_at: float | None = None
+    ) -> None:
+        """Record several queries in a single transaction."""
+        if not records:
+            return
+        executed_at = time.time() if executed_at is None else executed_at
+        with self._lock, self._db:
+            self._db.executemany(
+                """
+                INSERT INTO query_history (
+                    executed_at, fingerprint, query, keyspace, consistency_level,
+                    rows, bytes, prepare_ms, execute_ms, fetch_ms, total_ms
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        executed_at,
+                        fingerprint(record.query),
+                        record.query,
+                        record.keyspace,
+                        record.consistency_level,
+                        record.rows,
+                        record.bytes,
+                        record.prepare_ms,
+                        record.execute_ms,
+                        record.fetch_ms,
+                        record.total_ms,
+                    )
+                    for record in records
+                ],
+            )
+
+    def _latencies(
+        self, fingerprint: str | None, since: float | None, until: float | None
+    ) -> list[tuple[str, float, float]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if fingerprint is not None:
+            clauses.append("fingerprint = ?")
+            params.append(fingerprint)
+        if since is not None:
+            clauses.append("executed_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("executed_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._db.execute(
+                "SELECT fingerprint, executed_at, total_ms FROM query_history "
+                f"{where} ORDER BY fingerprint, executed_at",
+                params,
+            ).fetchall()
+
+    def latency_stats(
+        self,
+        fingerprint: str | None = None,
+        since: float | None = None,
+        bucket_seconds: float | None = 86400,
+    ) -> list[LatencyStats]:
+        """Return p50/p95/p99 of total latency per fingerprint, grouped into time
+        buckets of `bucket_seconds` (a single bucket when `None`).
+        """
+        samples: dict[tuple[str, float], list[float]] = {}
+        for fp, executed_at, total_ms in self._latencies(fingerprint, since, None):
+            bucket = (
+                executed_at - executed_at % bucket_seconds
+                if bucket_seconds
+                else (since or 0.0)
+            )
+            samples.setdefault((fp, bucket), []).append(total_ms)
+
+        stats: list[LatencyStats] = []
+        for (fp, bucket), values in sorted(samples.items()):
+            values.sort()
+            stats.append(
+                LatencyStats(
+                    fingerprint=fp,
+                    bucket_start=bucket,
+                    count=len(values),
+                    p50_ms=_percentile(values, 50),
+                    p95_ms=_percentile(values, 95),
+                    p99_ms=_percentile(values, 99),
+                )
+            )
+        return stats
+
+    def regressions(
+        self,
+        recent_seconds: float = 86400,
+        baseline_seconds: float = 7 * 86400,
+        threshold: float = 1.5,
+        min_samples: int = 5,
+        now: float | None = None,
+    ) -> list[Regression]:
+        """Flag fingerprints whose p95 latency over the last `recent_seconds`
+        exceeds `threshold` times their p95 over the preceding `baseline_seconds`.
+        """
+        now = time.time() if now is None else now
+        recent_start = now - recent_seconds
+        baseline_start = recent_start - baseline_seconds
+
+        baseline: dict[str, list[float]] = {}
+        recent: dict[str, list[float]] = {}
+        for fp, executed_at, total_ms in self._latencies(None, baseline_start, now):
+            window = recent if executed_at >= recent_start else baseline
+            window.setdefault(fp, []).append(total_ms)
+
+        regressions: list[Regression] = []
+        for fp, recent_values in recent.items():
+            baseline_values = baseline.get(fp, [])
+            if len(recent_values) < min_samples or len(baseline_values) < min_samples:
+                continue
+            recent_values.sort()
+            baseline_values.sort()
+            regression = Regression(
+                fingerprint=fp,
+                baseline_p95_ms=_percentile(baseline_values, 95),
+                recent_p95_ms=_percentile(recent_values, 95),
+                baseline_count=len(baseline_values),
+                recent_count=len(recent_values),
+            )
+            if regression.ratio >= threshold:
+                regressions.append(regression)
+        return sorted(regressions, key=lambda r: r.ratio, reverse=True)
+
+    def warmup_candidates(
+        self, keyspace: str | None = None, limit: int = 20
+    ) -> list[str]:
+        """Return the latest query text of the most frequently executed
+        fingerprints, to be prepared ahead of time.
+        """
+        params: list[Any] = []
+        where = ""
+        if keyspace is not None:
+            where = "WHERE keyspace = ?"
+            params.append(keyspace)
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(
+                f"""
+                SELECT history.query FROM (
+                    SELECT MAX(id) AS id, COUNT(*) AS executions
+                    FROM query_history {where}
+                    GROUP BY fingerprint
+                    ORDER BY executions DESC
+                    LIMIT ?
+                ) AS frequent
+                JOIN query_history AS history ON history.id = frequent.id
+                ORDER BY frequent.executions DESC
+                """,
+                params,
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from typing import Any, cast
+
+from cassandra.cluster import ResponseFuture
+from cassandra.query import PreparedStatement
+
+_DONE = object()
+
+# NOTE: approximate widths of fixed size values once converted to Python
+#       objects, variable size types are deliberately missing.
+FIXED_WIDTHS: dict[str, int] = {
+    "BooleanType": 8,
+    "ByteType": 8,
+    "CounterColumnType": 8,
+    "DateType": 8,
+    "DecimalType": 8,
+    "DoubleType": 8,
+    "FloatType": 8,
+    "InetAddressType": 16,
+    "Int32Type": 8,
+    "IntegerType": 8,
+    "LongType": 8,
+    "ShortType": 8,
+    "SimpleDateType": 8,
+    "TimeType": 8,
+    "TimeUUIDType": 36,
+    "TimestampType": 8,
+    "UUIDType": 36,
+}
+
+
+class PagePrefetcher:
+    """Iterate over the pages of a query while the next pages are fetched.
+
+    A page is requested with `start_fetching_next_page` from the driver's event
+    loop as soon as the previous one arrives, as long as fewer than `depth`
+    pages are buffered or in flight. The consuming thread is left to convert
+    rows, so network I/O and row conversion overlap.
+    """
+
+    def __init__(self, future: ResponseFuture, depth: int = 2) -> None:
+        self.future = future
+        self._pages: queue.Queue[Any] = queue.Queue()
+        self._lock = threading.Lock()
+        # NOTE: the first page is already in flight.
+        self._slots = max(depth, 1) - 1
+        self._pending_fetch = False
+        self._cancelled = False
+        self._requested_at = time.perf_counter()
+        self.latency_ms = 0.0
+        future.add_callbacks(callback=self._on_page, errback=self._on_error)
+
+    @property
+    def fetch_size(self) -> int | None:
+        return cast(int | None, self.future.message.fetch_size)
+
+    @fetch_size.setter
+    def fetch_size(self, fetch_size: int) -> None:
+        """Set the page size of the pages requested from now on."""
+        self.future.message.fetch_size = fetch_size
+
+    def _fetch_next_page(self) -> None:
+        self._requested_at = time.perf_counter()
+        self.future.start_fetching_next_page()
+
+    def _on_page(self, rows: list[Any]) -> None:
+        latency_ms = (time.perf_counter() - self._requested_at) * 1000
+        self._pages.put((rows, latency_ms))
+        if not self.future.has_more_pages:
+            self._pages.put(_DONE)
+            return
+        with self._lock:
+            if self._cancelled:
+                return
+            if not self._slots:
+                self._pending_fetch = True
+                return
+            self._slots -= 1
+        self._fetch_next_page()
+
+    def _on_error(self, exc: BaseException) -> None:
+        self._pages.put(exc)
+
+    def _release(self) -> None:
+        with self._lock:
+            if not self._pending_fetch:
+                self._slots += 1
+                return
+            self._pending_fetch = False
+        self._fetch_next_page()
+
+    def cancel(self) -> None:
+        """Stop requesting pages, a page already in flight is discarded."""
+        with self._lock:
+            self._cancelled = True
+            self._pending_fetch = False
+
+    def __iter__(self) -> Iterator[list[Any]]:
+        while True:
+            page = self._pages.get()
+            if page is _DONE:
+                return
+            if isinstance(page, BaseException):
+                raise page
+            rows, self.latency_ms = page
+            self._release()
+            yield rows
+
+
+class PageSizer:
+    """Pick the fetch size of queries, so pages hold about `target_bytes`.
+
+    Row widths are learned per table from the pages read, and a page size is
+    reduced when pages take longer than `max_latency_ms` to arrive. Until a
+    width is learned, it is derived from the column types when all of them
+    have a fixed size, otherwise pages start at `min_rows`.
+    """
+
+    def __init__(
+        self,
+        target_bytes: int = 1024 * 1024,
+        min_rows: int = 100,
+        max_rows: int = 10000,
+        max_latency_ms: float = 1000.0,
+    ) -> None:
+        self.target_bytes = target_bytes
+        self.min_rows = min_rows
+        self.max_rows = max(max_rows, min_rows)
+        self.max_latency_ms = max_latency_ms
+        self._row_bytes: dict[tuple[str, str], float] = {}
+
+    @staticmethod
+    def table_key(statement: PreparedStatement) -> tuple[str, str] | None:
+        if not statement.result_metadata:
+            return None
+        keyspace, table = statement.result_metadata[0][:2]
+        return keyspace, table
+
+    @staticmethod
+    def column_types(statement: PreparedStatement) -> list[type]:
+        return [column[3] for column in statement.result_metadata or []]
+
+    def _clamp(self, rows: float) -> int:
+        return int(min(max(rows, self.min_rows), self.max_rows))
+
+    def fetch_size(
+        self,
+        table: tuple[str, str] | None,
+        column_types: Sequence[type] | None = None,
+    ) -> int:
+        row_bytes = self._row_bytes.get(table) if table else None
+        if not row_bytes and column_types:
+            widths = [FIXED_WIDTHS.get(t.__name__) for t in column_types]
+            if all(widths):
+                row_bytes = sum(w for w in widths if w)
+        if not row_bytes:
+            return self.min_rows
+        return self._clamp(self.target_bytes / row_bytes)
+
+    def observe(
+        self,
+        table: tuple[str, str] | None,
+        rows: int,
+        page_bytes: int,
+        fetch_size: int,
+        latency_ms: float,
+    ) -> int:
+        """Learn the row width of a table from the size of a page, and return the
+        fetch size to use for the next pages.
+        """
+        if rows and table:
+            row_bytes = max(page_bytes / rows, 1)
+            previous = self._row_bytes.get(table)
+            # NOTE: exponential moving average, so one page of
+            #       unusually wide rows does not dominate the learned width.
+            self._row_bytes[table] = (
+                row_bytes if previous is None else (previous + row_bytes) / 2
+            )
+        next_fetch_size = self.fetch_size(table)
+        if latency_ms > self.max_latency_ms:
+            next_fetch_size = min(
+                next_fetch_size,
+                self._clamp(fetch_size * self.max_latency_ms / latency_ms),
+            )
+        return next_fetch_size
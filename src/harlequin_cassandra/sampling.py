@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import random
+import re
+from dataclasses import dataclass
+from math import ceil
+
+# NOTE: bounds of the token ring per token class, tokens of the
+#       ByteOrderedPartitioner are not integers and are not supported.
+TOKEN_BOUNDS: dict[str, tuple[int, int]] = {
+    "Murmur3Token": (-(2**63), 2**63 - 1),
+    "MD5Token": (0, 2**127),
+}
+# NOTE: number of rows read by each token range probe
+SAMPLE_SLICE_SIZE = 10
+# NOTE: maximum number of token range probes in flight
+SAMPLE_CONCURRENCY = 32
+
+_SAMPLEABLE_QUERY = re.compile(
+    r"^\s*SELECT\s+(?P<columns>.+?)\s+FROM\s+(?P<table>[\w\"]+(?:\s*\.\s*[\w\"]+)?)"
+    r"\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+@dataclass
+class SampleTarget:
+    columns: str
+    table: str
+    keyspace: str | None
+    table_name: str
+
+
+def _unquote(identifier: str) -> str:
+    identifier = identifier.strip()
+    if identifier.startswith('"') and identifier.endswith('"'):
+        return identifier[1:-1].replace('""', '"')
+    return identifier.lower()
+
+
+def parse_sample_target(query: str) -> SampleTarget | None:
+    """Parse a `SELECT <columns> FROM <table>` query without any clauses,
+    returns `None` if the query can not be sampled.
+    """
+    match = _SAMPLEABLE_QUERY.match(query)
+    if not match:
+        return None
+    table = match.group("table")
+    parts = table.split(".")
+    keyspace = _unquote(parts[0]) if len(parts) == 2 else None
+    return SampleTarget(
+        columns=match.group("columns").strip(),
+        table=table.strip(),
+        keyspace=keyspace,
+        table_name=_unquote(parts[-1]),
+    )
+
+
+def token_ranges(ring: list[int], bounds: tuple[int, int]) -> list[tuple[int, int]]:
+    """Return the `(start, end]` token ranges owned by the ring, the range
+    wrapping around the end of the ring is split in two.
+    """
+    if not ring:
+        return [bounds]
+    ranges = list(zip(ring, ring[1:]))
+    minimum, maximum = bounds
+    if ring[-1] < maximum:
+        ranges.append((ring[-1], maximum))
+    if minimum < ring[0]:
+        ranges.append((minimum, ring[0]))
+    return ranges
+
+
+def split_ranges(ranges: list[tuple[int, int]], count: int) -> list[tuple[int, int]]:
+    """Split every range into equal sub-ranges, so there are at least `count`
+    ranges to probe.
+    """
+    if not ranges or len(ranges) >= count:
+        return ranges
+    parts = ceil(count / len(ranges))
+    split: list[tuple[int, int]] = []
+    for start, end in ranges:
+        bounds = sorted({start + (end - start) * i // parts for i in range(parts)})
+        split.extend(zip(bounds, bounds[1:] + [end]))
+    return split
+
+
+def probe_ranges(
+    ranges: list[tuple[int, int]], rng: random.Random | None = None
+) -> list[tuple[int, int]]:
+    """Shuffle the ranges and pick a random start within each of them, so every
+    probe reads a random slice owned by a single replica set.
+    """
+    rng = rng or random.Random()
+    probes = [(rng.randint(start, end - 1), end) for start, end in ranges]
+    rng.shuffle(probes)
+    return probes
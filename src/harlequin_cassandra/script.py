@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+# NOTE: keywords that change the schema, statements starting with
+#       them act as a barrier when executing a script.
+DDL_KEYWORDS = ("CREATE", "ALTER", "DROP", "TRUNCATE", "USE", "GRANT", "REVOKE")
+# NOTE: keywords of statements that may be executed concurrently
+#       with their neighbours, as long as they are not lightweight transactions.
+CONCURRENT_KEYWORDS = ("INSERT", "UPDATE", "DELETE", "BEGIN")
+
+_WORD = re.compile(r"[A-Za-z_]+")
+_LWT = re.compile(r"\bIF\b", re.IGNORECASE)
+_BATCH_END = re.compile(r"\bAPPLY\s+BATCH\s*$", re.IGNORECASE)
+_BATCH_START = re.compile(
+    r"^BEGIN\s+(?:(?:UNLOGGED|COUNTER)\s+)?BATCH\b", re.IGNORECASE
+)
+
+
+@dataclass
+class ScriptStatement:
+    index: int
+    query: str
+
+    @property
+    def keyword(self) -> str:
+        match = _WORD.match(self.query)
+        return match.group(0).upper() if match else ""
+
+    @property
+    def is_ddl(self) -> bool:
+        return self.keyword in DDL_KEYWORDS
+
+    @property
+    def is_concurrent(self) -> bool:
+        """Whether the statement can be executed concurrently with other
+        statements, lightweight transactions have to be executed in order.
+        """
+        if self.keyword not in CONCURRENT_KEYWORDS:
+            return False
+        return not _LWT.search(_strip_literals(self.query))
+
+
+def _strip_literals(query: str) -> str:
+    return re.sub(r"'(?:[^']|'')*'|\$\$.*?\$\$|\"(?:[^\"]|\"\")*\"", "", query)
+
+
+def split_statements(script: str) -> list[ScriptStatement]:
+    """Split a CQL script into statements.
+
+    Semicolons inside of string literals, quoted identifiers, comments, and
+    `BEGIN BATCH ... APPLY BATCH` blocks do not terminate a statement.
+    Comments are removed from the returned statements.
+    """
+    statements: list[str] = []
+    current: list[str] = []
+    in_batch = False
+    i = 0
+    length = len(script)
+
+    def flush() -> None:
+        statement = "".join(current).strip()
+        if statement:
+            statements.append(statement)
+        current.clear()
+
+    while i < length:
+        char = script[i]
+        pair = script[i : i + 2]
+        if pair in ("--", "//"):
+            end = script.find("\n", i)
+            i = length if end == -1 else end
+        elif pair == "/*":
+            end = script.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+            current.append(" ")
+        elif pair == "$$":
+            end = script.find("$$", i + 2)
+            end = length if end == -1 else end + 2
+            current.append(script[i:end])
+            i = end
+        elif char in ("'", '"'):
+            end = i + 1
+            while end < length:
+                if script[end] == char:
+                    # NOTE: quotes are escaped by doubling them
+                    if script[end + 1 : end + 2] == char:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            current.append(script[i : end + 1])
+            i = end + 1
+        elif char == ";":
+            pending = "".join(current).strip()
+            if not in_batch and _BATCH_START.match(pending):
+                in_batch = True
+            if in_batch and not _BATCH_END.search(pending):
+                current.append(char)
+            else:
+                in_batch = False
+                flush()
+            i += 1
+        else:
+            current.append(char)
+            i += 1
+    flush()
+    return [
+        ScriptStatement(index=index, query=query)
+        for index, query in enumerate(statements)
+    ]
+
+
+def group_statements(
+    statements: list[ScriptStatement],
+) -> list[list[ScriptStatement]]:
+    """Group consecutive statements that can be executed concurrently, every
+    other statement is placed in a group of its own.
+    """
+    groups: list[list[ScriptStatement]] = []
+    for statement in statements:
+        if (
+            statement.is_concurrent
+            and groups
+            and all(previous.is_concurrent for previous in groups[-1])
+        ):
+            groups[-1].append(statement)
+        else:
+            groups.append([statement])
+    return groups
@@ -13,6 +13,8 @@ from textual_fastdatatable.backend import create_backend
 from harlequin_cassandra.adapter import (
     HarlequinCassandraAdapter,
     HarlequinCassandraConnection,
+    HarlequinCassandraCursor,
+    HarlequinCassandraScriptCursor,
 )
 
 if sys.version_info < (3, 10):
@@ -185,6 +187,124 @@ def test_insert_into_table(connection: HarlequinCassandraConnection) -> None:
     assert backend.row_count == 1
 
 
+@pytest.mark.usefixtures("setup_and_teradown_keyspace")
+def test_execute_script(connection: HarlequinCassandraConnection) -> None:
+    session = connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS test.mocktable (
+            id int PRIMARY KEY,
+            name text,
+            position int);
+        INSERT INTO test.mocktable (id, name, position) VALUES (1, 'a;b', 1);
+        INSERT INTO test.mocktable (id, name, position) VALUES (2, 'b', 2);
+        UPDATE test.mocktable SET position = 3 WHERE id = 2;
+        SELECT * FROM test.mocktable;
+        """
+    )
+    assert isinstance(session, HarlequinCassandraScriptCursor)
+    assert session.columns() == [
+        ("#", "#"),
+        ("statement", "s"),
+        ("status", "s"),
+        ("rows", "#"),
+    ]
+    data = session.fetchall()
+    assert [row[0] for row in data] == [0, 1, 2, 3, 4]
+    assert [row[2] for row in data] == ["OK"] * 5
+    assert [row[3] for row in data] == [None, None, None, None, 2]
+    assert data[1][1] == (
+        "INSERT INTO test.mocktable (id, name, position) VALUES (1, 'a;b', 1)"
+    )
+    assert connection.cluster.metadata.keyspaces["test"].tables.get("mocktable")
+
+
+@pytest.mark.usefixtures("setup_and_teradown_keyspace")
+def test_execute_script_skips_after_failed_group(
+    connection: HarlequinCassandraConnection,
+) -> None:
+    session = connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS test.mocktable (id int PRIMARY KEY, name text);
+        INSERT INTO test.mocktable (id, name) VALUES (1, 'a');
+        INSERT INTO test.missingtable (id, name) VALUES (1, 'a');
+        INSERT INTO test.mocktable (id, name) VALUES (2, 'b');
+        DROP TABLE test.mocktable;
+        INSERT INTO test.mocktable (id, name) VALUES (3, 'c');
+        """
+    )
+    assert isinstance(session, HarlequinCursor)
+    statuses = [row[2] for row in session.fetchall()]
+    assert statuses[0] == "OK"
+    assert statuses[1] == "OK"
+    assert statuses[2] not in ("OK", "SKIPPED")
+    assert statuses[3] == "OK"
+    assert statuses[4:] == ["SKIPPED", "SKIPPED"]
+    assert connection.cluster.metadata.keyspaces["test"].tables.get("mocktable")
+
+
+@pytest.mark.usefixtures("setup_and_teradown_keyspace")
+def test_execute_script_set_limit(connection: HarlequinCassandraConnection) -> None:
+    session = connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS test.mocktable (id int PRIMARY KEY);
+        INSERT INTO test.mocktable (id) VALUES (1);
+        INSERT INTO test.mocktable (id) VALUES (2);
+        """
+    )
+    assert isinstance(session, HarlequinCursor)
+    data = session.set_limit(2).fetchall()
+    assert len(data) == 2
+
+
+@pytest.mark.usefixtures("setup_and_teradown_keyspace")
+def test_sample_table(connection: HarlequinCassandraConnection) -> None:
+    inserts = "\n".join(
+        f"INSERT INTO test.mocktable (id, name) VALUES ({i}, 'name{i}');"
+        for i in range(200)
+    )
+    session = connection.execute(
+        "CREATE TABLE IF NOT EXISTS test.mocktable (id int PRIMARY KEY, name text);"
+        f"{inserts}"
+    )
+    assert isinstance(session, HarlequinCursor)
+    session.fetchall()
+
+    session = connection.execute("SELECT id, name FROM test.mocktable;")
+    assert isinstance(session, HarlequinCassandraCursor)
+    data = session.set_sample(15).fetchall()
+    assert data
+    assert 0 < len(data) <= 15
+    assert len({row[0] for row in data}) == len(data)
+    assert session.columns() == [("id", "#"), ("name", "s")]
+    backend = create_backend(data)
+    assert backend.column_count == 2
+
+    session = connection.execute("SELECT id, name FROM test.mocktable;")
+    assert isinstance(session, HarlequinCassandraCursor)
+    data = session.set_sample(1000).set_limit(5).fetchall()
+    assert data
+    assert len(data) <= 5
+
+
+@pytest.mark.usefixtures("setup_and_teradown_keyspace")
+def test_sample_raises_query_error(connection: HarlequinCassandraConnection) -> None:
+    session = connection.execute(
+        "CREATE TABLE IF NOT EXISTS test.mocktable (id int PRIMARY KEY, name text);"
+    )
+    assert isinstance(session, HarlequinCursor)
+    session.fetchall()
+
+    session = connection.execute("SELECT * FROM test.mocktable WHERE id = 1;")
+    assert isinstance(session, HarlequinCassandraCursor)
+    with pytest.raises(HarlequinQueryError):
+        session.set_sample(10).fetchall()
+
+    session = connection.execute("SELECT * FROM test.mocktable;")
+    assert isinstance(session, HarlequinCassandraCursor)
+    with pytest.raises(HarlequinQueryError):
+        session.set_sample(0)
+
+
 @pytest.mark.usefixtures("setup_and_teradown_keyspace")
 def test_create_view(connection: HarlequinCassandraConnection) -> None:
     session = connection.execute(
@@ -0,0 +1,126 @@
+from pathlib import Path
+
+import pytest
+from harlequin_cassandra.history import (
+    QueryHistory,
+    QueryRecord,
+    estimate_rows_size,
+    estimate_size,
+    fingerprint,
+)
+
+
+def _record(query: str, total_ms: float, keyspace: str = "test") -> QueryRecord:
+    return QueryRecord(
+        query=query,
+        keyspace=keyspace,
+        consistency_level="LOCAL_ONE",
+        rows=1,
+        bytes=16,
+        prepare_ms=0.0,
+        execute_ms=total_ms,
+        fetch_ms=0.0,
+    )
+
+
+def test_fingerprint_strips_literals() -> None:
+    assert fingerprint(
+        "SELECT * FROM t1 WHERE id = 4f0f5bb4-7ef3-4a8e-9b5e-3b1f6c1d0e2a "
+        "AND name = 'it''s' AND n IN (1, 2, 3); -- comment"
+    ) == fingerprint("select *   from t1 where id = ? and name = 'x' and n in (4)")
+
+
+def test_estimate_size() -> None:
+    assert estimate_size(("abc", b"\x00\x01", None, 1, {"k": ["v"]})) == 15
+
+
+def test_estimate_rows_size_samples_rows() -> None:
+    rows = [("a" * 10,)] * 100 + [("a" * 1000,)] * 100
+    assert estimate_rows_size(rows, sample_rows=100) == 2000
+    assert estimate_rows_size(rows[:50]) == 500
+    assert estimate_rows_size([]) == 0
+
+
+def test_latency_stats() -> None:
+    history = QueryHistory(":memory:")
+    for total_ms in range(1, 101):
+        history.record(
+            _record(f"SELECT * FROM t WHERE id = {total_ms}", total_ms),
+            executed_at=10.0,
+        )
+    stats = history.latency_stats(bucket_seconds=None)
+    assert len(stats) == 1
+    assert stats[0].count == 100
+    assert stats[0].p50_ms == 50.5
+    assert 95 <= stats[0].p95_ms <= 96
+    history.close()
+
+
+def test_regressions_and_warmup() -> None:
+    history = QueryHistory(":memory:")
+    for _ in range(10):
+        history.record(_record("SELECT * FROM slow", 10), executed_at=100.0)
+        history.record(_record("SELECT * FROM slow", 50), executed_at=200.0)
+        history.record(_record("SELECT * FROM fast", 10), executed_at=100.0)
+        history.record(_record("SELECT * FROM fast", 10), executed_at=200.0)
+    history.record(_record("SELECT * FROM other", 10, keyspace="other"))
+
+    regressions = history.regressions(
+        recent_seconds=50, baseline_seconds=150, now=210.0
+    )
+    assert [r.fingerprint for r in regressions] == ["select * from slow"]
+    assert regressions[0].ratio == 5
+
+    candidates = history.warmup_candidates(keyspace="test", limit=5)
+    assert sorted(candidates) == ["SELECT * FROM fast", "SELECT * FROM slow"]
+    history.close()
+
+
+def test_fingerprint_keeps_comment_markers_in_literals() -> None:
+    assert fingerprint(
+        "INSERT INTO t (id, url) VALUES (1, 'https://a.com/x')"
+    ) == fingerprint("INSERT INTO t (id, url) VALUES (2, 'http://b.org')")
+    assert fingerprint("SELECT * FROM t WHERE a = 'x--y' AND b = 1") != fingerprint(
+        "SELECT * FROM t WHERE a = 'x--y' AND c = 2"
+    )
+    assert fingerprint("SELECT * FROM t WHERE a = 'a--b' AND b = 1") == (
+        "select * from t where a = ? and b = ?"
+    )
+    assert (
+        fingerprint("INSERT INTO t (id, url) VALUES (1, 'https://a.com/x')")
+        == "insert into t (id, url) values (?)"
+    )
+
+
+def test_history_expands_user_path(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    history = QueryHistory("~/harlequin/history.db")
+    history.record(_record("SELECT * FROM t", 1))
+    history.close()
+    assert (tmp_path / "harlequin" / "history.db").is_file()
+
+
+def test_record_many() -> None:
+    history = QueryHistory(":memory:")
+    history.record_many(
+        [_record(f"SELECT * FROM t WHERE id = {i}", i) for i in range(1, 6)],
+        executed_at=10.0,
+    )
+    history.record_many([])
+    stats = history.latency_stats(bucket_seconds=None)
+    assert [(s.fingerprint, s.count) for s in stats] == [
+        ("select * from t where id = ?", 5)
+    ]
+    history.close()
+
+
+def test_fingerprint_keeps_quoted_identifier_case() -> None:
+    assert fingerprint('SELECT * FROM "MyTable" WHERE "Id" = 1') == (
+        'select * from "MyTable" where "Id" = ?'
+    )
+    assert fingerprint('SELECT * FROM "MyTable"') != fingerprint(
+        "SELECT * FROM mytable"
+    )
+    assert fingerprint("SELECT * FROM MyTable") == fingerprint("select * from mytable")
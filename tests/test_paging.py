@@ -0,0 +1,81 @@
+from typing import Any, Callable
+
+from cassandra.cqltypes import BooleanType, Int32Type, UTF8Type, UUIDType
+from harlequin_cassandra.paging import PagePrefetcher, PageSizer
+
+
+class FakeResponseFuture:
+    """Serves pages synchronously, recording how far ahead pages are requested."""
+
+    def __init__(self, pages: list[list[int]]) -> None:
+        self.pages = pages
+        self.requested = 1
+        self.has_more_pages = len(pages) > 1
+        self._callback: Callable[[Any], None] | None = None
+
+    def add_callbacks(
+        self, callback: Callable[[Any], None], errback: Callable[[Any], None]
+    ) -> None:
+        self._callback = callback
+        callback(self.pages[0])
+
+    def start_fetching_next_page(self) -> None:
+        assert self._callback is not None
+        page = self.pages[self.requested]
+        self.requested += 1
+        self.has_more_pages = self.requested < len(self.pages)
+        self._callback(page)
+
+
+def test_prefetcher_yields_all_pages() -> None:
+    pages = [[1, 2], [3, 4], [5]]
+    future = FakeResponseFuture(pages)
+    assert list(PagePrefetcher(future, depth=2)) == pages
+
+
+def test_prefetcher_respects_depth() -> None:
+    future = FakeResponseFuture([[i] for i in range(10)])
+    prefetcher = PagePrefetcher(future, depth=3)
+    assert future.requested == 3
+    for consumed, _ in enumerate(prefetcher, start=1):
+        assert future.requested <= consumed + 3
+        if consumed == 4:
+            prefetcher.cancel()
+            break
+    assert future.requested == 7
+
+
+def test_page_sizer_targets_bytes() -> None:
+    sizer = PageSizer(target_bytes=10_000, min_rows=10, max_rows=1000)
+    table = ("test", "mocktable")
+    assert sizer.fetch_size(table) == 10
+
+    assert (
+        sizer.observe(table, rows=50, page_bytes=200, fetch_size=1000, latency_ms=1)
+        == 1000
+    )
+
+    sizer = PageSizer(target_bytes=10_000, min_rows=10, max_rows=1000)
+    assert (
+        sizer.observe(table, rows=50, page_bytes=25_000, fetch_size=1000, latency_ms=1)
+        == 20
+    )
+    assert sizer.fetch_size(table) == 20
+    assert sizer.fetch_size(("test", "other")) == 10
+
+
+def test_page_sizer_backs_off_on_latency() -> None:
+    sizer = PageSizer(target_bytes=10_000, min_rows=10, max_rows=1000)
+    table = ("test", "mocktable")
+    assert (
+        sizer.observe(table, rows=50, page_bytes=500, fetch_size=800, latency_ms=4000)
+        == 200
+    )
+
+
+def test_page_sizer_seeds_width_from_column_types() -> None:
+    sizer = PageSizer(target_bytes=10_000, min_rows=10, max_rows=1000)
+    table = ("test", "mocktable")
+    assert sizer.fetch_size(table, [Int32Type, UUIDType]) == 227
+    assert sizer.fetch_size(table, [Int32Type, UTF8Type]) == 10
+    assert sizer.fetch_size(table, [BooleanType]) == 1000
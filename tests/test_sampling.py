@@ -0,0 +1,48 @@
+import random
+from math import ceil
+
+from harlequin_cassandra.sampling import (
+    SAMPLE_SLICE_SIZE,
+    parse_sample_target,
+    probe_ranges,
+    split_ranges,
+    token_ranges,
+)
+
+
+def test_parse_sample_target() -> None:
+    target = parse_sample_target('SELECT id, name FROM test."MockTable";')
+    assert target is not None
+    assert target.columns == "id, name"
+    assert target.keyspace == "test"
+    assert target.table_name == "MockTable"
+
+    target = parse_sample_target("select * from MockTable")
+    assert target is not None
+    assert target.keyspace is None
+    assert target.table_name == "mocktable"
+
+    assert parse_sample_target("SELECT * FROM t WHERE id = 1") is None
+    assert parse_sample_target("SELECT * FROM t LIMIT 10") is None
+
+
+def test_token_ranges_and_probes() -> None:
+    ranges = token_ranges([-50, 0, 50], (-100, 100))
+    assert ranges == [(-50, 0), (0, 50), (50, 100), (-100, -50)]
+
+    probes = probe_ranges(ranges, random.Random(0))
+    assert len(probes) == len(ranges)
+    for start, end in probes:
+        assert (next(r for r in ranges if r[1] == end)[0]) <= start < end
+
+
+def test_split_ranges_covers_large_samples() -> None:
+    ranges = token_ranges([-50, 0, 50], (-100, 100))
+    size = 10 * len(ranges) * 3
+    split = split_ranges(ranges, ceil(size / SAMPLE_SLICE_SIZE))
+    assert len(split) >= ceil(size / SAMPLE_SLICE_SIZE)
+    assert all(start < end for start, end in split)
+    assert sum(end - start for start, end in split) == sum(
+        end - start for start, end in ranges
+    )
+    assert split_ranges(ranges, 2) == ranges
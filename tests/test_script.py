@@ -0,0 +1,50 @@
+from harlequin_cassandra.script import group_statements, split_statements
+
+
+def test_split_statements() -> None:
+    statements = split_statements(
+        """
+        -- create the table; twice
+        CREATE TABLE t (id int PRIMARY KEY, name text);
+        INSERT INTO t (id, name) VALUES (1, 'a;b''c');
+        /* block; comment */
+        INSERT INTO "we;ird" (id) VALUES (2);
+        BEGIN BATCH
+            INSERT INTO t (id, name) VALUES (3, 'c');
+            UPDATE t SET name = 'd' WHERE id = 3;
+        APPLY BATCH;
+        SELECT * FROM t
+        """
+    )
+    assert [statement.query for statement in statements] == [
+        "CREATE TABLE t (id int PRIMARY KEY, name text)",
+        "INSERT INTO t (id, name) VALUES (1, 'a;b''c')",
+        'INSERT INTO "we;ird" (id) VALUES (2)',
+        "BEGIN BATCH\n"
+        "            INSERT INTO t (id, name) VALUES (3, 'c');\n"
+        "            UPDATE t SET name = 'd' WHERE id = 3;\n"
+        "        APPLY BATCH",
+        "SELECT * FROM t",
+    ]
+    assert statements[0].is_ddl
+    assert statements[3].is_concurrent
+    assert not statements[4].is_concurrent
+
+
+def test_group_statements() -> None:
+    statements = split_statements(
+        "CREATE TABLE t (id int PRIMARY KEY, name text);"
+        "INSERT INTO t (id) VALUES (1);"
+        "UPDATE t SET name = 'if' WHERE id = 1;"
+        "INSERT INTO t (id) VALUES (2) IF NOT EXISTS;"
+        "DELETE FROM t WHERE id = 1;"
+        "DELETE FROM t WHERE id = 2;"
+        "DROP TABLE t;"
+    )
+    assert [[s.index for s in group] for group in group_statements(statements)] == [
+        [0],
+        [1, 2],
+        [3],
+        [4, 5],
+        [6],
+    ]